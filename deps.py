@@ -0,0 +1,64 @@
+import asyncio
+import os
+from functools import lru_cache
+
+import httpx
+import redis.asyncio as aioredis
+from dotenv import load_dotenv
+from google import genai
+
+
+@lru_cache(maxsize=1)
+def get_genai_client():
+    """
+    Singleton Gemini client shared by all routers — one SDK connection pool
+    instead of one per module.
+    """
+    load_dotenv()
+    return genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+
+@lru_cache(maxsize=1)
+def get_http_client():
+    """
+    Singleton async HTTP client for all outbound API calls. HTTP/2 lets
+    concurrent weather/mandi requests to the same host share one TCP stream.
+    Closed once on app shutdown.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(10),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        headers={"User-Agent": "AgriPulse-Backend/1.0"},
+    )
+
+
+@lru_cache(maxsize=1)
+def get_redis():
+    """
+    Optional shared Redis cache — None when REDIS_URL is unset. With multiple
+    uvicorn workers the in-process TTLCaches are per-worker, so Redis lets the
+    whole deployment pay for one external fetch per key instead of one per worker.
+    """
+    load_dotenv()
+    url = os.getenv("REDIS_URL")
+    if not url:
+        return None
+    return aioredis.Redis.from_url(url)
+
+
+# --- In-flight request coalescing ---
+_INFLIGHT: dict[str, asyncio.Task] = {}
+
+
+async def coalesce(key: str, coro_factory):
+    """
+    Collapse concurrent calls with the same key into one shared task: the
+    first caller fires coro_factory(), everyone else awaits the same result.
+    """
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.create_task(coro_factory())
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda _t: _INFLIGHT.pop(key, None))
+    return await task
@@ -1,13 +1,35 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from routers import chat, detect, dashboard, terminal
-from google import genai  # ✅ new import
+from deps import get_http_client, get_redis
+import asyncio
+import logging
+import logging.handlers
 import os
+import queue
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="AgriPulse Backend")
+# ✅ Async logging: formatting + I/O happen on a background thread, so the
+# request path never blocks on stdout
+_log_queue = queue.Queue(-1)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+)
+# Attach the QueueHandler to the root logger directly — basicConfig would
+# give it a default formatter, which QueueHandler applies on enqueue, so the
+# listener's StreamHandler would then format every line a second time
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.INFO)
+_root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(_log_queue, _stream_handler)
+_log_listener.start()
+
+app = FastAPI(title="AgriPulse Backend", default_response_class=ORJSONResponse)
 
 # ✅ Allow frontend access
 app.add_middleware(
@@ -21,8 +43,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ✅ Initialize Gemini client (NO configure anymore)
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+# ✅ Compress large JSON payloads (dashboard/terminal bodies easily top 50 KB)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # ✅ Include routers
 app.include_router(chat.router)
@@ -31,12 +53,40 @@ app.include_router(dashboard.router)
 app.include_router(terminal.router)
 
 
+# ✅ Keep dashboards for popular locations pre-built. The task lives on
+# app.state: the loop only keeps a weak reference, so an anonymous task
+# could be garbage-collected mid-loop
+@app.on_event("startup")
+async def start_cache_warmer():
+    app.state.cache_warmer = asyncio.create_task(dashboard.warm_dashboard_cache())
+
+
 @app.get("/")
 def home():
     return {"message": "Welcome to AgriPulse API!"}
 
 
+# ✅ Release pooled HTTP connections on shutdown
+@app.on_event("shutdown")
+async def close_http_sessions():
+    warmer = getattr(app.state, "cache_warmer", None)
+    if warmer is not None:
+        warmer.cancel()
+    await get_http_client().aclose()
+    if get_redis() is not None:
+        await get_redis().aclose()
+    terminal.SESSION.close()
+    _log_listener.stop()
+
+
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 10000)))
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", 10000)),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+    )
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, HTTPException, Request
-from google import genai
-import os
+from fastapi.responses import StreamingResponse
+import logging
 from dotenv import load_dotenv
 
+from deps import get_genai_client
+
 load_dotenv()
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+client = get_genai_client()
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["AI Chatbot"])
 
@@ -44,15 +48,25 @@ async def chat(request: Request):
         {message}
         """
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-        )
+        # 🚿 Stream tokens as Gemini generates them (fast time-to-first-byte)
+        async def gen():
+            try:
+                stream = await client.aio.models.generate_content_stream(
+                    model="gemini-2.5-flash",
+                    contents=prompt,
+                )
+                async for chunk in stream:
+                    yield chunk.text or ""
+            except Exception as e:
+                logger.error("Gemini chat error: %s", e)
+                yield "AI response failed. Please try again later."
 
-        return {"response": response.text.strip()}
+        return StreamingResponse(gen(), media_type="text/plain")
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print("❌ Gemini Chat Error:", e)
+        logger.error("Gemini chat error: %s", e)
         raise HTTPException(
             status_code=500, detail="AI response failed. Please try again later."
         )
@@ -1,27 +1,228 @@
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
-from google import genai
-import requests
+from fastapi.responses import ORJSONResponse
+import asyncio
+import hashlib
+import logging
+import orjson
 import os
 import datetime
+import pandas as pd
+from cachetools import TTLCache
 from dotenv import load_dotenv
+from google.genai import types
+from pydantic import BaseModel
+
+from deps import coalesce, get_genai_client, get_http_client, get_redis
 
 # --- Load environment variables ---
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+# --- Shared async HTTP client (keep-alive + HTTP/2 multiplexing) ---
+async_client = get_http_client()
+
 # --- API Keys ---
 WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
 DATA_GOV_API_KEY = os.getenv("DATA_GOV_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-# --- Initialize Gemini Client ---
-client = genai.Client(api_key=GEMINI_API_KEY)
+# --- Shared Gemini Client ---
+client = get_genai_client()
+
+# --- High-traffic locations kept warm by the background refresher ---
+TOP_LOCATIONS = ["Indore", "Delhi", "Mumbai", "Pune", "Jaipur"]
+
+# --- TTL caches for upstream API responses (keyed by location) ---
+DASHBOARD_CACHE = TTLCache(maxsize=64, ttl=900)  # fully built payloads
+WEATHER_CACHE = TTLCache(maxsize=512, ttl=900)  # weather changes ~15 min
+MANDI_CACHE = TTLCache(maxsize=512, ttl=3600)  # mandi prices change ~hourly
+GEMINI_CACHE = TTLCache(maxsize=1024, ttl=900)  # LLM outputs, keyed by prompt hash
+
+# --- Optional second cache level shared across workers (None without REDIS_URL) ---
+_redis = get_redis()
+
+
+async def cache_get(local_cache: TTLCache, key: str):
+    """
+    Two-level cache read: in-process TTLCache first, then shared Redis.
+    Redis hits are copied into the local cache so repeat reads stay in-process.
+    """
+    val = local_cache.get(key)
+    if val is not None:
+        return val
+    if _redis is not None:
+        try:
+            raw = await _redis.get(key)
+            if raw is not None:
+                val = orjson.loads(raw)
+                local_cache[key] = val
+                return val
+        except Exception as e:
+            logger.warning("Redis get failed for %s: %s", key, e)
+    return None
+
+
+async def cache_set(local_cache: TTLCache, key: str, value):
+    """Write-through: local cache plus Redis with the same TTL."""
+    local_cache[key] = value
+    if _redis is not None:
+        try:
+            await _redis.setex(key, int(local_cache.ttl), orjson.dumps(value))
+        except Exception as e:
+            logger.warning("Redis set failed for %s: %s", key, e)
+
+
+# --- Schema for the combined dashboard AI reply (enforced by Gemini) ---
+class CropInsight(BaseModel):
+    crop: str
+    recommendation_type: str
+    confidence: int
+    reason: list[str]
+
+
+class DashboardAI(BaseModel):
+    summary: str
+    crops: list[CropInsight]
+
+
+# --- Static prompt sections, assembled once at import time ---
+DASHBOARD_AI_PROMPT_HEAD = (
+    "You are *AgriPulse AI* — India's agriculture advisor and precision crop "
+    "decisioning system.\n"
+)
+
+DASHBOARD_AI_PROMPT_TASKS = """Produce:
+
+1. "summary" — a friendly, factual farmer briefing for the location above, under
+   120 words, covering: 1️⃣ Weather Outlook 2️⃣ Market Trends 3️⃣ Weekly Advisory.
+
+2. "crops" — the TOP 3 crops to *plant or sell* this week, ranked by confidence
+   (0–100), with recommendation_type "plant" or "sell" and 3–6 reason bullets.
+
+   Base the ranking on temperature/rainfall/humidity, market prices and momentum,
+   crop seasonality and soil compatibility, national/global demand growth, export
+   feasibility, MSP/policy updates, and regional risk alerts. Cite weather or market
+   data points numerically where possible. If a crop is seasonally unsuited or
+   high-risk, give confidence ≤40 with clear rationale.
+"""
+
+SUMMARY_PROMPT_HEAD = "You are AgriPulse AI — India's agriculture advisor.\n"
+
+SUMMARY_PROMPT_TAIL = """1️⃣ Weather Outlook
+2️⃣ Market Trends
+3️⃣ Weekly Advisory
+
+Keep it factual, under 120 words, and friendly.
+"""
+
+CROP_PROMPT_HEAD = (
+    "You are *AgriPulse AI* — a next-generation agricultural intelligence system "
+    "built for precision crop decisioning.\n"
+)
+
+CROP_PROMPT_INSTRUCTIONS = """
+Analyze the live data for the location above and output the TOP 3 crops to *plant or sell* this week.
+
+Your analysis must be based on:
+- Temperature, rainfall, humidity, and soil conditions of the region
+- Market prices, price momentum, and short-term demand trends
+- Crop seasonality and soil compatibility
+- National and global demand growth of each crop
+- El Niño / La Niña impact on local yield and climate patterns
+- Global economic indicators (IMF, World Bank commodity outlooks)
+- Country-level import/export duties and trade restrictions
+- Feasibility of exporting crops for maximum margins
+- Government policies, MSP updates, or procurement drives
+- Storage, logistics, and supply chain factors that affect price realization
+- Energy/fertilizer costs and other input-side economics
+- Regional risk alerts (pests, diseases, weather extremes)
+- Strategic reserves and inventory cycles that could influence demand
+
+*Instructions:*
+- Output must be strictly valid JSON — no text outside JSON.
+- Rank top 3 crops by confidence (0–100).
+- For each crop, include detailed reasoning as bullet points showing logic and data links.
+- Keep reasoning short, factual, and high signal (3–6 bullets per crop).
+- Output only the following JSON structure exactly:
+
+[
+  {
+    "crop": "Soybean",
+    "recommendation_type": "plant" | "sell",
+    "confidence": 92,
+    "reason": [
+      "- Bullet 1: specific reason",
+      "- Bullet 2: specific reason",
+      "- Bullet 3: specific reason",
+      "... up to 6"
+    ]
+  },
+  {
+    "crop": "Wheat",
+    "recommendation_type": "sell",
+    "confidence": 85,
+    "reason": [
+      "- Bullet 1: specific reason",
+      "- Bullet 2: specific reason",
+      "- Bullet 3: specific reason"
+    ]
+  },
+  {
+    "crop": "Maize",
+    "recommendation_type": "plant",
+    "confidence": 80,
+    "reason": [
+      "- Bullet 1: specific reason",
+      "- Bullet 2: specific reason",
+      "- Bullet 3: specific reason"
+    ]
+  }
+]
+
+*Additional Notes for Model:*
+- Always cite weather or market data points numerically when possible (e.g., “Rainfall <10mm next 7 days” or “Price up +6% WoW”).
+- “Confidence” reflects holistic synthesis of agronomic fit, market outlook, and macro trade feasibility — not a statistical probability.
+- If a crop is seasonally unsuited or high-risk, give confidence ≤40 with clear rationale.
+- Prioritize data-driven and economically rational reasoning — avoid generic or repetitive phrasing.
+- Keep response deterministic and concise enough for real-time dashboards.
+"""
+
+
+def gemini_cache_key(prompt: str) -> str:
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def compact_weather(weather):
+    """
+    Boils the full weather payload down to the handful of numbers Gemini
+    actually uses, keeping prompt tokens (and prefill latency) low.
+    """
+    cur = weather.get("current", {}) or {}
+    forecast = weather.get("forecast", []) or []
+    return {
+        "temp_c": cur.get("temp_c"),
+        "humidity": cur.get("humidity"),
+        "condition": cur.get("condition"),
+        "wind_kph": cur.get("wind_kph"),
+        "rain_7d_mm": round(sum(d.get("totalprecip_mm") or 0 for d in forecast), 1),
+        "max_rain_chance": max(
+            (d.get("daily_chance_of_rain") or 0 for d in forecast), default=0
+        ),
+    }
+
+
+def compact_market(market):
+    """Commodity + modal price only — drops fields Gemini doesn't need."""
+    return [
+        {"commodity": r.get("commodity"), "modal": r.get("modal_price")}
+        for r in market[:5]
+    ]
 
 
 @router.get("/")
-def get_dashboard(location: str = "Indore"):
+async def get_dashboard(location: str = "Indore"):
     """
     Fetches:
     - Live weather (WeatherAPI)
@@ -30,69 +231,145 @@ def get_dashboard(location: str = "Indore"):
     """
 
     try:
-        # 1️⃣ Fetch Weather
-        weather_data = fetch_weather_data(location)
-
-        # 2️⃣ Fetch Mandi Prices (data.gov.in)
-        mandi_data = fetch_mandi_data(location)
-
-        # 3️⃣ Fetch Latest Agriculture News (placeholder for now)
-        news_data = [
-            {
-                "headline": "Govt raises MSP for wheat by ₹150/quintal",
-                "summary": "Government increases wheat MSP to boost Rabi season earnings.",
-                "sentiment": "positive",
-            },
-            {
-                "headline": "Rainfall expected in Northern India this weekend",
-                "summary": "IMD predicts moderate rain, farmers advised to delay sowing by 2 days.",
-                "sentiment": "neutral",
-            },
-            {
-                "headline": "Soybean exports rise 8% amid global demand",
-                "summary": "Soybean prices surge as exports grow globally.",
-                "sentiment": "positive",
-            },
-        ]
+        cached = await cache_get(DASHBOARD_CACHE, f"agripulse:dashboard:{location}")
+        if cached is not None:
+            return ORJSONResponse(content=cached)
+
+        dashboard_data, complete = await build_dashboard_payload(location)
+        # Only cache fully-built payloads: a payload with fallback sections
+        # would serve canned data for the whole TTL after one upstream blip
+        if complete:
+            await cache_set(
+                DASHBOARD_CACHE, f"agripulse:dashboard:{location}", dashboard_data
+            )
+        return ORJSONResponse(content=dashboard_data)
 
-        # 4️⃣ AI Summaries and Insights from Gemini
-        ai_summary = generate_ai_summary(location, weather_data, mandi_data, news_data)
-        ai_crop_insights = generate_multi_crop_insights(
-            location, weather_data, mandi_data
-        )
+    except Exception as e:
+        logger.error("Dashboard error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # 5️⃣ Standardized Response
-        dashboard_data = {
-            "date": datetime.datetime.now().strftime("%d %b %Y"),
-            "location": location,
-            "weather": weather_data,
-            "market_data": mandi_data,
-            "news": news_data,
-            "ai_summary": ai_summary,
-            "ai_crop_insights": ai_crop_insights,
-        }
 
-        return JSONResponse(content=dashboard_data)
+async def build_dashboard_payload(location: str):
+    """
+    Builds the full dashboard payload for a location (also used by the
+    background cache warmer). Returns (payload, complete) — complete is False
+    when any section came from a fallback, so callers don't cache stub data.
+    """
+    # 1️⃣ + 2️⃣ Fetch Weather + Mandi Prices concurrently (independent I/O)
+    (weather_data, weather_ok), (mandi_data, mandi_ok) = await asyncio.gather(
+        fetch_weather_data(location),
+        fetch_mandi_data(location),
+    )
+
+    # 3️⃣ Fetch Latest Agriculture News (placeholder for now)
+    news_data = [
+        {
+            "headline": "Govt raises MSP for wheat by ₹150/quintal",
+            "summary": "Government increases wheat MSP to boost Rabi season earnings.",
+            "sentiment": "positive",
+        },
+        {
+            "headline": "Rainfall expected in Northern India this weekend",
+            "summary": "IMD predicts moderate rain, farmers advised to delay sowing by 2 days.",
+            "sentiment": "neutral",
+        },
+        {
+            "headline": "Soybean exports rise 8% amid global demand",
+            "summary": "Soybean prices surge as exports grow globally.",
+            "sentiment": "positive",
+        },
+    ]
 
-    except Exception as e:
-        print("❌ Dashboard Error:", e)
-        raise HTTPException(status_code=500, detail=str(e))
+    # 4️⃣ AI Summary and Insights from Gemini (one combined LLM call).
+    # Concurrent requests for the same location in the same hour share
+    # a single in-flight call instead of each paying for their own.
+    hour_bucket = datetime.datetime.now().strftime("%Y%m%d%H")
+    ai_summary, ai_crop_insights, ai_ok = await coalesce(
+        f"dashboard-ai:{location}:{hour_bucket}",
+        lambda: generate_dashboard_ai(location, weather_data, mandi_data, news_data),
+    )
+
+    # 5️⃣ Standardized Response
+    dashboard_data = {
+        "date": datetime.datetime.now().strftime("%d %b %Y"),
+        "location": location,
+        "weather": weather_data,
+        "market_data": mandi_data,
+        "news": news_data,
+        "ai_summary": ai_summary,
+        "ai_crop_insights": ai_crop_insights,
+    }
+
+    return dashboard_data, weather_ok and mandi_ok and ai_ok
+
+
+async def warm_dashboard_cache():
+    """
+    Background loop: rebuilds dashboards for high-traffic locations every
+    15 minutes so real user requests always hit a warm cache.
+    """
+    while True:
+        for loc in TOP_LOCATIONS:
+            try:
+                payload, complete = await build_dashboard_payload(loc)
+                if complete:
+                    await cache_set(
+                        DASHBOARD_CACHE, f"agripulse:dashboard:{loc}", payload
+                    )
+                else:
+                    logger.warning("Not caching %s: built with fallback data", loc)
+            except Exception as e:
+                logger.warning("Cache warm failed for %s: %s", loc, e)
+        await asyncio.sleep(900)
+
+
+@router.post("/cache/invalidate")
+async def invalidate_cache():
+    """
+    Manually bust the dashboard caches (e.g. after an upstream fix). Clears
+    all four local caches and the shared Redis keys so this worker doesn't
+    keep serving entries the other workers no longer see.
+    """
+    DASHBOARD_CACHE.clear()
+    WEATHER_CACHE.clear()
+    MANDI_CACHE.clear()
+    GEMINI_CACHE.clear()
+    if _redis is not None:
+        try:
+            async for key in _redis.scan_iter("agripulse:*"):
+                await _redis.delete(key)
+        except Exception as e:
+            logger.warning("Redis invalidate failed: %s", e)
+    return {"message": "Dashboard caches cleared"}
 
 
 # ============================
 # 🌤️ WEATHER DATA
 # ============================
-def fetch_weather_data(location: str):
+async def fetch_weather_data(location: str):
+    """Returns (weather, ok) — ok is False when the canned fallback was used."""
+    cache_key = f"agripulse:weather:{location}"
+    cached = await cache_get(WEATHER_CACHE, cache_key)
+    if cached is not None:
+        return cached, True
+
+    # Per-location in-flight dedup: concurrent cold-cache requests for the
+    # same city share one upstream call, while different cities fetch in
+    # parallel instead of queueing on a global lock
+    return await coalesce(cache_key, lambda: _fetch_weather_upstream(location))
+
+
+async def _fetch_weather_upstream(location: str):
     try:
         url = f"http://api.weatherapi.com/v1/forecast.json?key={WEATHER_API_KEY}&q={location}&days=7&aqi=no&alerts=no"
-        res = requests.get(url, timeout=10)
+        res = await async_client.get(url)
         res.raise_for_status()
-        data = res.json()
+        data = orjson.loads(res.content)
 
         current = data.get("current", {})
         forecast_days = data.get("forecast", {}).get("forecastday", [])
 
-        return {
+        weather = {
             "location": data.get("location", {}).get("name", location),
             "country": data.get("location", {}).get("country", "India"),
             "current": {
@@ -120,21 +397,33 @@ def fetch_weather_data(location: str):
                 for d in forecast_days
             ],
         }
+        await cache_set(WEATHER_CACHE, f"agripulse:weather:{location}", weather)
+        return weather, True
     except Exception as e:
-        print("⚠️ WeatherAPI fallback:", e)
+        logger.warning("WeatherAPI fallback: %s", e)
         return {
             "location": location,
             "country": "India",
             "current": {"temp_c": 30, "condition": "Clear", "humidity": 60},
             "astro": {"sunrise": "06:30 AM", "sunset": "05:45 PM"},
             "forecast": [],
-        }
+        }, False
 
 
 # ============================
 # 📊 MARKET DATA (MANDI)
 # ============================
-def fetch_mandi_data(location: str):
+async def fetch_mandi_data(location: str):
+    """Returns (mandi, ok) — ok is False when the canned fallback was used."""
+    cache_key = f"agripulse:mandi:{location}"
+    cached = await cache_get(MANDI_CACHE, cache_key)
+    if cached is not None:
+        return cached, True
+
+    return await coalesce(cache_key, lambda: _fetch_mandi_upstream(location))
+
+
+async def _fetch_mandi_upstream(location: str):
     try:
         url = "https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070"
         params = {
@@ -143,156 +432,169 @@ def fetch_mandi_data(location: str):
             "limit": 10,
             "filters[market]": location,
         }
-        res = requests.get(url, params=params, timeout=10)
+        res = await async_client.get(url, params=params)
         res.raise_for_status()
-        records = res.json().get("records", [])
+        records = orjson.loads(res.content).get("records", [])
 
         if not records:
             raise Exception("No mandi data found")
 
-        return [
-            {
-                "commodity": r.get("commodity", "Unknown"),
-                "market": r.get("market", location),
-                "modal_price": float(r.get("modal_price", 0)),
-                "max_price": float(r.get("max_price", 0)),
-                "min_price": float(r.get("min_price", 0)),
-                "arrival_date": r.get("arrival_date", ""),
-            }
-            for r in records
-        ]
+        # Batch-convert price columns in one C-level pass instead of three
+        # float() calls per row
+        df = pd.DataFrame(records)
+        for col in ("modal_price", "max_price", "min_price"):
+            df[col] = (
+                pd.to_numeric(df[col], errors="coerce").fillna(0.0)
+                if col in df.columns
+                else 0.0
+            )
+        df["commodity"] = (
+            df["commodity"].fillna("Unknown") if "commodity" in df.columns else "Unknown"
+        )
+        df["market"] = df["market"].fillna(location) if "market" in df.columns else location
+        if "arrival_date" not in df.columns:
+            df["arrival_date"] = ""
+
+        mandi = df[
+            ["commodity", "market", "modal_price", "max_price", "min_price", "arrival_date"]
+        ].to_dict("records")
+        await cache_set(MANDI_CACHE, f"agripulse:mandi:{location}", mandi)
+        return mandi, True
 
     except Exception as e:
-        print("⚠️ Mandi Fallback:", e)
+        logger.warning("Mandi fallback: %s", e)
         return [
             {"commodity": "Wheat", "market": location, "modal_price": 2300},
             {"commodity": "Soybean", "market": location, "modal_price": 5200},
             {"commodity": "Maize", "market": location, "modal_price": 1850},
-        ]
+        ], False
+
+
+# ============================
+# 🧠 GEMINI COMBINED DASHBOARD AI
+# ============================
+async def generate_dashboard_ai(location, weather, market, news):
+    """
+    Single Gemini call returning both the farmer summary and the top-3 crop
+    insights, so the dashboard pays one LLM round-trip instead of two.
+    Falls back to the separate helpers if the combined reply can't be parsed.
+    Returns (summary, crops, ok) — ok is False when only stub text came back.
+    """
+    prompt = (
+        DASHBOARD_AI_PROMPT_HEAD
+        + f"""
+Using this real data:
+- Location: {location}
+- Weather Summary: {compact_weather(weather)}
+- Market Prices: {compact_market(market)}
+- News: {news}
+
+"""
+        + DASHBOARD_AI_PROMPT_TASKS
+    )
+    try:
+        key = f"agripulse:gemini:{gemini_cache_key(prompt)}"
+        cached = await cache_get(GEMINI_CACHE, key)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+        response = await client.aio.models.generate_content(
+            model="gemini-2.5-flash",
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=DashboardAI,
+            ),
+        )
+        parsed: DashboardAI = response.parsed
+        if parsed is None:
+            raise ValueError("Gemini returned no parsable structured output")
+        # List (not tuple) so it survives the orjson round-trip through Redis
+        result = [parsed.summary.strip(), [c.model_dump() for c in parsed.crops]]
+        await cache_set(GEMINI_CACHE, key, result)
+        return result[0], result[1], True
+    except Exception as e:
+        logger.warning("Combined Gemini fallback, using separate calls: %s", e)
+        (summary, summary_ok), (crops, crops_ok) = await asyncio.gather(
+            generate_ai_summary(location, weather, market, news),
+            generate_multi_crop_insights(location, weather, market),
+        )
+        return summary, crops, summary_ok and crops_ok
 
 
 # ============================
 # 🧠 GEMINI AI SUMMARIES
 # ============================
-def generate_ai_summary(location, weather, market, news):
+async def generate_ai_summary(location, weather, market, news):
+    """Returns (summary, ok) — ok is False when the stub summary was used."""
     try:
-        prompt = f"""
-        You are AgriPulse AI — India's agriculture advisor.
-
-        Using this real data:
-        - Weather Forecast: {weather}
-        - Market Prices: {market[:5]}
-        - News: {news[:3]}
-
-        Summarize for farmers in {location}:
-        1️⃣ Weather Outlook
-        2️⃣ Market Trends
-        3️⃣ Weekly Advisory
-
-        Keep it factual, under 120 words, and friendly.
-        """
-        response = client.models.generate_content(
+        prompt = (
+            SUMMARY_PROMPT_HEAD
+            + f"""
+Using this real data:
+- Weather Forecast: {compact_weather(weather)}
+- Market Prices: {compact_market(market)}
+- News: {news}
+
+Summarize for farmers in {location}:
+"""
+            + SUMMARY_PROMPT_TAIL
+        )
+        key = f"agripulse:gemini:{gemini_cache_key(prompt)}"
+        cached = await cache_get(GEMINI_CACHE, key)
+        if cached is not None:
+            return cached, True
+
+        response = await client.aio.models.generate_content(
             model="gemini-2.5-flash",
             contents=prompt,
         )
-        return response.text.strip()
+        summary = response.text.strip()
+        await cache_set(GEMINI_CACHE, key, summary)
+        return summary, True
     except Exception as e:
-        print("⚠️ Gemini summary fallback:", e)
-        return "Stable weather and moderate market trends this week. Monitor rain probability and wheat prices."
+        logger.warning("Gemini summary fallback: %s", e)
+        return (
+            "Stable weather and moderate market trends this week. Monitor rain probability and wheat prices.",
+            False,
+        )
 
 
 # ============================
 # 🌾 GEMINI MULTI-CROP INSIGHTS
 # ============================
-def generate_multi_crop_insights(location, weather, market):
+async def generate_multi_crop_insights(location, weather, market):
     """
     Asks Gemini to provide 3 recommended crops with confidence levels and reasons.
+    Returns (crops, ok) — ok is False when the default crop list was used.
     """
     try:
-        prompt = f"""
-        You are *AgriPulse AI* — a next-generation agricultural intelligence system built for precision crop decisioning.
-
+        prompt = (
+            CROP_PROMPT_HEAD
+            + f"""
 Constant input (do not modify these lines; they are injected dynamically):
-        Weather: {weather}
-        Mandi Prices: {market[:5]}
-
-Analyze the live data for {location} and output the TOP 3 crops to *plant or sell* this week.
-
-Your analysis must be based on:
-- Temperature, rainfall, humidity, and soil conditions of the region  
-- Market prices, price momentum, and short-term demand trends  
-- Crop seasonality and soil compatibility  
-- National and global demand growth of each crop  
-- El Niño / La Niña impact on local yield and climate patterns  
-- Global economic indicators (IMF, World Bank commodity outlooks)  
-- Country-level import/export duties and trade restrictions  
-- Feasibility of exporting crops for maximum margins  
-- Government policies, MSP updates, or procurement drives  
-- Storage, logistics, and supply chain factors that affect price realization  
-- Energy/fertilizer costs and other input-side economics  
-- Regional risk alerts (pests, diseases, weather extremes)  
-- Strategic reserves and inventory cycles that could influence demand  
-
-*Instructions:*
-- Output must be strictly valid JSON — no text outside JSON.
-- Rank top 3 crops by confidence (0–100).
-- For each crop, include detailed reasoning as bullet points showing logic and data links.
-- Keep reasoning short, factual, and high signal (3–6 bullets per crop).
-- Output only the following JSON structure exactly:
-
-[
-  {
-    "crop": "Soybean",
-    "recommendation_type": "plant" | "sell",
-    "confidence": 92,
-    "reason": [
-      "- Bullet 1: specific reason",
-      "- Bullet 2: specific reason",
-      "- Bullet 3: specific reason",
-      "... up to 6"
-    ]
-  },
-  {
-    "crop": "Wheat",
-    "recommendation_type": "sell",
-    "confidence": 85,
-    "reason": [
-      "- Bullet 1: specific reason",
-      "- Bullet 2: specific reason",
-      "- Bullet 3: specific reason"
-    ]
-  },
-  {
-    "crop": "Maize",
-    "recommendation_type": "plant",
-    "confidence": 80,
-    "reason": [
-      "- Bullet 1: specific reason",
-      "- Bullet 2: specific reason",
-      "- Bullet 3: specific reason"
-    ]
-  }
-]
+        Location: {location}
+        Weather: {compact_weather(weather)}
+        Mandi Prices: {compact_market(market)}
+"""
+            + CROP_PROMPT_INSTRUCTIONS
+        )
 
-*Additional Notes for Model:*
-- Always cite weather or market data points numerically when possible (e.g., “Rainfall <10mm next 7 days” or “Price up +6% WoW”).  
-- “Confidence” reflects holistic synthesis of agronomic fit, market outlook, and macro trade feasibility — not a statistical probability.  
-- If a crop is seasonally unsuited or high-risk, give confidence ≤40 with clear rationale.  
-- Prioritize data-driven and economically rational reasoning — avoid generic or repetitive phrasing.  
-- Keep response deterministic and concise enough for real-time dashboards.
-        """
+        key = f"agripulse:gemini:{gemini_cache_key(prompt)}"
+        cached = await cache_get(GEMINI_CACHE, key)
+        if cached is not None:
+            return cached, True
 
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model="gemini-2.5-flash",
             contents=prompt,
         )
 
-        import json
-
         try:
             text = response.text.strip()
-            crops = json.loads(text)
-            return crops
+            crops = orjson.loads(text)
+            await cache_set(GEMINI_CACHE, key, crops)
+            return crops, True
         except Exception:
             # Fallback to default crops if JSON parsing fails
             return [
@@ -311,12 +613,12 @@ Your analysis must be based on:
                     "confidence": 78,
                     "reason": "Good returns in dry conditions",
                 },
-            ]
+            ], False
 
     except Exception as e:
-        print("⚠️ Gemini Crop Fallback:", e)
+        logger.warning("Gemini crop fallback: %s", e)
         return [
             {"crop": "Wheat", "confidence": 80, "reason": "Favorable conditions"},
             {"crop": "Maize", "confidence": 75, "reason": "Moderate temperatures"},
             {"crop": "Soybean", "confidence": 70, "reason": "Stable market rates"},
-        ]
+        ], False
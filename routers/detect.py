@@ -1,15 +1,17 @@
 from fastapi import APIRouter, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
-from google import genai
-import os
+from fastapi.responses import ORJSONResponse
+import logging
 from dotenv import load_dotenv
+
+from deps import get_genai_client
 import base64
 import io
 from PIL import Image
 
 # --- Setup ---
 load_dotenv()
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+logger = logging.getLogger(__name__)
+client = get_genai_client()
 
 router = APIRouter(prefix="/detect", tags=["Disease Detection"])
 
@@ -50,8 +52,9 @@ async def detect_disease(file: UploadFile = File(...)):
         Keep the JSON clean and concise, no markdown or explanations.
         """
 
-        # Call Gemini 2.5 Flash Vision model
-        response = client.models.generate_content(
+        # Call Gemini 2.5 Flash Vision model — async variant so the upload
+        # route doesn't block the event loop for the duration of the call
+        response = await client.aio.models.generate_content(
             model="gemini-2.5-flash",
             contents=[
                 {
@@ -73,19 +76,19 @@ async def detect_disease(file: UploadFile = File(...)):
         ai_output = response.text.strip()
 
         # Try parsing as JSON (if Gemini responds in proper JSON)
-        import json
+        import orjson
 
         try:
-            parsed = json.loads(ai_output)
-        except json.JSONDecodeError:
+            parsed = orjson.loads(ai_output)
+        except orjson.JSONDecodeError:
             # Fallback: return the raw AI text if not valid JSON
             parsed = {"raw_response": ai_output}
 
         # Attach filename
         parsed["filename"] = file.filename
 
-        return JSONResponse(content=parsed)
+        return ORJSONResponse(content=parsed)
 
     except Exception as e:
-        print("❌ Gemini error:", e)
+        logger.error("Gemini error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
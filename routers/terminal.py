@@ -1,18 +1,32 @@
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+import asyncio
+import hashlib
+import heapq
+import logging
 import requests
+import threading
+from requests.adapters import HTTPAdapter, Retry
 import os
 import datetime
-import json
-import statistics
+import time
+import orjson
 import random
+import numpy as np
 import pandas as pd
+from functools import lru_cache
 from pathlib import Path
-from google import genai
+from cachetools import TTLCache
 from dotenv import load_dotenv
+from google.genai import types
+from pydantic import BaseModel
+
+from deps import get_genai_client, get_http_client
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/terminal", tags=["Agri Terminal"])
 
 # =============================
@@ -20,10 +34,95 @@ router = APIRouter(prefix="/terminal", tags=["Agri Terminal"])
 # =============================
 DATA_GOV_API_KEY = os.getenv("DATA_GOV_API_KEY")
 WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 DISTANCEMATRIX_API_KEY = os.getenv("DISTANCEMATRIX_API_KEY")
 
-client = genai.Client(api_key=GEMINI_API_KEY)
+client = get_genai_client()
+
+# --- TTL caches: Gemini keyed by prompt hash, upstream APIs by query params ---
+# GEMINI_CACHE is touched from asyncio.to_thread workers (TTLCache is not
+# thread-safe); the other caches are only used on the event loop
+GEMINI_CACHE = TTLCache(maxsize=1024, ttl=900)
+_gemini_cache_lock = threading.Lock()
+MANDI_CACHE = TTLCache(maxsize=256, ttl=900)  # keyed (commodity, limit)
+WEATHER_CACHE = TTLCache(maxsize=256, ttl=600)  # keyed location
+
+# --- Schema for the structured insight (enforced by Gemini) ---
+class Recommendation(BaseModel):
+    action: str
+    confidence: int
+    reason: str
+
+
+class YieldOutlook(BaseModel):
+    change_percent: str
+    factors: list[str]
+
+
+class MarketSentiment(BaseModel):
+    overall: str
+    keywords: list[str]
+
+
+class MarketQuote(BaseModel):
+    market: str
+    state: str
+    price: float
+
+
+class OptimalMarket(BaseModel):
+    sell_high: list[MarketQuote]
+    buy_low: list[MarketQuote]
+
+
+class InsightResponse(BaseModel):
+    recommendation: Recommendation
+    yield_outlook: YieldOutlook
+    price_forecast_comment: str
+    market_sentiment: MarketSentiment
+    optimal_market: OptimalMarket
+    ai_summary: str
+    reason: str
+
+
+# --- Static prompt sections, assembled once at import time ---
+INSIGHT_PROMPT_HEAD = "You are AgriPulse Market Intelligence.\n"
+
+INSIGHT_PROMPT_TASKS = """
+Tasks:
+1\u20e3 Recommendation: choose one action from BUY / HOLD / SELL for next 2 weeks. Return confidence (0\u2013100) and reason.
+2\u20e3 Yield Outlook: percent change vs last season (approx) and 2\u20134 influencing factors.
+3\u20e3 Price Forecast Comment: 1 sentence on near-term drivers.
+4\u20e3 Market Sentiment: overall (positive/neutral/negative) and 2 keywords.
+5\u20e3 Optimal Markets: top 5 sell_high (market,state,price) and top 5 buy_low.
+6\u20e3 ai_summary (short) and reason (1\u20133 sentence reasoning).
+"""
+
+# --- Shared HTTP session (keep-alive + connection pooling, sync callers) ---
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.2),
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+SESSION.headers.update({"User-Agent": "AgriPulse-Backend/1.0"})
+
+# --- Shared async HTTP client (keep-alive + HTTP/2 multiplexing) ---
+async_client = get_http_client()
+
+# --- 1-second timestamp cache: the terminal is polled far more often than
+# the displayed minute changes ---
+_ts_cache = (0.0, "")
+
+
+def current_timestamp():
+    global _ts_cache
+    now = time.time()
+    if now - _ts_cache[0] > 1.0:
+        _ts_cache = (now, f"{datetime.datetime.now():%d %b %Y, %I:%M %p}")
+    return _ts_cache[1]
+
 
 DATA_PATH = (
     Path(__file__).resolve().parents[1]
@@ -36,25 +135,41 @@ DATA_PATH = (
 # 🌾 MAIN TERMINAL ENDPOINT
 # ============================================================
 @router.get("/")
-def get_market_terminal(
+async def get_market_terminal(
     commodity: str = Query("wheat"),
     limit: int = Query(200),
     harvest_days: int = Query(53),
     location: str = Query("Indore"),
+    top_n: int = Query(25),
 ):
     try:
-        # 1️⃣ Fetch Mandi data
-        records = fetch_mandi_records(commodity=commodity, limit=limit)
-        market_data = normalize_mandi_records(records, commodity)
-
-        # 2️⃣ Compute summary
-        modal_prices = [m["modal_price"] for m in market_data if m.get("modal_price")]
-        avg_price = round(statistics.mean(modal_prices), 2) if modal_prices else 0
-
-        highest_market = max(market_data, key=lambda x: x.get("modal_price", 0))
-        lowest_market = min(
-            market_data, key=lambda x: x.get("modal_price", float("inf"))
+        # 1️⃣ + 3️⃣ Fetch Mandi data + Weather concurrently (independent I/O)
+        records, weather = await asyncio.gather(
+            fetch_mandi_records(commodity=commodity, limit=limit),
+            fetch_weather_for_location(location),
         )
+        mandi_df = normalize_mandi_frame(records, commodity)
+        market_data = _frame_to_records(mandi_df)
+
+        # 2️⃣ Compute summary in a single pass (sum/count/min/max fused)
+        price_sum = 0.0
+        price_count = 0
+        highest_market = None
+        lowest_market = None
+        for m in market_data:
+            p = m.get("modal_price")
+            if p is None:
+                continue
+            price_sum += p
+            price_count += 1
+            if highest_market is None or p > highest_market["modal_price"]:
+                highest_market = m
+            if lowest_market is None or p < lowest_market["modal_price"]:
+                lowest_market = m
+
+        avg_price = round(price_sum / price_count, 2) if price_count else 0
+        highest_market = highest_market or {}
+        lowest_market = lowest_market or {}
 
         summary = {
             "commodity": commodity.capitalize(),
@@ -65,14 +180,13 @@ def get_market_terminal(
             "lowest_market": f"{lowest_market.get('market','')}, {lowest_market.get('state','')}",
         }
 
-        # 3️⃣ Fetch Weather
-        weather = fetch_weather_for_location(location)
-
         # 4️⃣ Forecast Prices
-        price_forecast = generate_price_forecast(market_data, days=7)
+        price_forecast = generate_price_forecast(mandi_df, days=7)
 
-        # 5️⃣ AI Insight
-        ai_structured = generate_structured_ai_insight(
+        # 5️⃣ AI Insight — sync Gemini SDK call runs on a worker thread so it
+        # doesn't block the event loop for other requests
+        ai_structured = await asyncio.to_thread(
+            generate_structured_ai_insight,
             commodity,
             market_data,
             summary,
@@ -82,14 +196,21 @@ def get_market_terminal(
             location,
         )
 
-        # 6️⃣ Final Response
-        return JSONResponse(
+        # 6️⃣ Final Response — summary/forecast/AI above used the full list;
+        # only ship the rows the terminal table actually renders
+        top_market_data = sorted(
+            (m for m in market_data if m.get("modal_price") is not None),
+            key=lambda m: m["modal_price"],
+            reverse=True,
+        )[:top_n]
+
+        return ORJSONResponse(
             content={
-                "timestamp": datetime.datetime.now().strftime("%d %b %Y, %I:%M %p"),
+                "timestamp": current_timestamp(),
                 "commodity": commodity.capitalize(),
                 "location": location,
                 "summary": summary,
-                "market_data": market_data,
+                "market_data": top_market_data,
                 "price_forecast": price_forecast,
                 "recommendation": ai_structured.get("recommendation", {}),
                 "yield_outlook": ai_structured.get("yield_outlook", {}),
@@ -104,14 +225,19 @@ def get_market_terminal(
         )
 
     except Exception as e:
-        print("❌ Terminal Error:", e)
+        logger.error("Terminal error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # ============================================================
 # 🏪 FETCH & NORMALIZE MANDI DATA
 # ============================================================
-def fetch_mandi_records(commodity: str, limit: int = 200):
+async def fetch_mandi_records(commodity: str, limit: int = 200):
+    cache_key = (commodity.lower(), limit)
+    cached = MANDI_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         url = "https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070"
         params = {
@@ -120,13 +246,14 @@ def fetch_mandi_records(commodity: str, limit: int = 200):
             "limit": limit,
             "filters[commodity]": commodity.capitalize(),
         }
-        r = requests.get(url, params=params, timeout=12)
-        data = r.json().get("records", [])
+        r = await async_client.get(url, params=params, timeout=12)
+        data = orjson.loads(r.content).get("records", [])
         if not data:
             raise Exception("No mandi data found.")
+        MANDI_CACHE[cache_key] = data
         return data
     except Exception as e:
-        print("⚠️ Using fallback mandi data:", e)
+        logger.warning("Using fallback mandi data: %s", e)
         today = datetime.datetime.now().strftime("%Y-%m-%d")
         return [
             {
@@ -156,70 +283,120 @@ def fetch_mandi_records(commodity: str, limit: int = 200):
         ]
 
 
-def normalize_mandi_records(records, commodity_name):
-    normalized = []
-    for r in records:
-        try:
-            modal_val = float(r["modal_price"])
-            normalized.append(
-                {
-                    "state": r.get("state", ""),
-                    "district": r.get("district", ""),
-                    "market": r.get("market", ""),
-                    "commodity": commodity_name.capitalize(),
-                    "variety": r.get("variety", ""),
-                    "arrival_date": r.get("arrival_date", ""),
-                    "min_price": float_or_none(r.get("min_price")),
-                    "max_price": float_or_none(r.get("max_price")),
-                    "modal_price": modal_val,
-                    "unit": r.get("price_unit", "Rs/Quintal"),
-                }
-            )
-        except Exception:
-            continue
-    return normalized
+def normalize_mandi_frame(records, commodity_name):
+    """Cleaned mandi DataFrame — shared by the records view and the forecast."""
+    df = pd.DataFrame(records)
+    if df.empty:
+        return df
 
+    for col in ("state", "district", "market", "variety", "arrival_date"):
+        if col not in df.columns:
+            df[col] = ""
+    for col in ("min_price", "max_price", "modal_price"):
+        df[col] = (
+            pd.to_numeric(df[col], errors="coerce") if col in df.columns else np.nan
+        )
 
-def float_or_none(x):
-    try:
-        return float(x)
-    except Exception:
-        return None
+    df = df.dropna(subset=["modal_price"])
+    df["commodity"] = commodity_name.capitalize()
+    df["unit"] = (
+        df["price_unit"].fillna("Rs/Quintal")
+        if "price_unit" in df.columns
+        else "Rs/Quintal"
+    )
+
+    return df[
+        [
+            "state",
+            "district",
+            "market",
+            "commodity",
+            "variety",
+            "arrival_date",
+            "min_price",
+            "max_price",
+            "modal_price",
+            "unit",
+        ]
+    ]
+
+
+def _frame_to_records(df):
+    if df.empty:
+        return []
+    # NaN → None so min/max gaps serialize as JSON null
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def normalize_mandi_records(records, commodity_name):
+    return _frame_to_records(normalize_mandi_frame(records, commodity_name))
 
 
 # ============================================================
 # 🌦 WEATHER FETCHER
 # ============================================================
-def fetch_weather_for_location(location):
+async def fetch_weather_for_location(location):
+    cached = WEATHER_CACHE.get(location)
+    if cached is not None:
+        return cached
+
     try:
         url = f"http://api.weatherapi.com/v1/forecast.json?key={WEATHER_API_KEY}&q={location}&days=7"
-        data = requests.get(url, timeout=10).json()
-        return {
+        data = orjson.loads((await async_client.get(url, timeout=10)).content)
+        weather = {
             "location": data.get("location", {}).get("name", location),
             "country": data.get("location", {}).get("country", "India"),
             "current": data.get("current", {}),
         }
+        WEATHER_CACHE[location] = weather
+        return weather
     except Exception as e:
-        print("⚠️ Weather Fallback:", e)
+        logger.warning("Weather fallback: %s", e)
         return {"location": location, "country": "India", "current": {}}
 
 
 # ============================================================
 # 📈 PRICE FORECAST
 # ============================================================
-def generate_price_forecast(market_data, days=7):
-    today = datetime.datetime.utcnow().date()
-    prices = [m["modal_price"] for m in market_data if m.get("modal_price")]
-    baseline = statistics.median(prices) if prices else 0
-    forecast = []
-    for i in range(1, days + 1):
-        forecast.append(
-            {
-                "date": (today + datetime.timedelta(days=i)).strftime("%Y-%m-%d"),
-                "forecast_price": round(baseline + random.uniform(-50, 50), 2),
-            }
+def generate_price_forecast(mandi_df, days=7):
+    """Takes the already-normalized mandi DataFrame so no Series are rebuilt."""
+    today = datetime.datetime.now(datetime.UTC).date()
+
+    if mandi_df.empty:
+        prices = pd.Series(dtype=float)
+        dates = pd.Series(dtype="datetime64[ns]")
+    else:
+        prices = mandi_df["modal_price"]
+        # arrival_date mixes dd/mm/yyyy (data.gov.in) and yyyy-mm-dd (fallback);
+        # format="mixed" parses each value directly instead of probing formats
+        # via raised-and-caught ValueErrors per element
+        dates = pd.to_datetime(
+            mandi_df["arrival_date"],
+            errors="coerce",
+            format="mixed",
+            dayfirst=True,
         )
-    return forecast
+    baseline = float(prices.median()) if prices.notna().any() else 0.0
+
+    # Vectorized trend from arrival dates (Rs/day), if enough dated rows exist
+    trend = 0.0
+    mask = prices.notna() & dates.notna()
+    if mask.sum() >= 2 and dates[mask].nunique() > 1:
+        x = (dates[mask] - dates[mask].min()).dt.days.to_numpy()
+        trend = float(np.polyfit(x, prices[mask].to_numpy(), 1)[0])
+
+    # One vectorized draw + round for the whole horizon instead of a
+    # Python-level random.uniform/round call per day
+    day_idx = np.arange(1, days + 1)
+    jitter = np.random.default_rng().uniform(-50, 50, size=days)
+    forecast_prices = np.round(baseline + trend * day_idx + jitter, 2)
+    return [
+        {
+            "date": (today + datetime.timedelta(days=int(i))).strftime("%Y-%m-%d"),
+            "forecast_price": float(p),
+        }
+        for i, p in zip(day_idx, forecast_prices)
+    ]
 
 
 # ============================================================
@@ -243,63 +420,68 @@ def generate_structured_ai_insight(
             {
                 "market": m.get("market"),
                 "state": m.get("state"),
-                "modal_price": m.get("modal_price"),
+                # Whole rupees are plenty for the model and cheaper to tokenize
+                "modal_price": (
+                    round(m["modal_price"]) if m.get("modal_price") is not None else None
+                ),
             }
             for m in market_data[:25]
         ]
 
-        prompt = f"""
-You are AgriPulse Market Intelligence. Return ONLY a valid JSON object (no explanations).
+        # Only the weather numbers the model uses — not the full API payload
+        current = weather.get("current", {}) or {}
+        condition = current.get("condition")
+        weather_brief = {
+            "location": weather.get("location"),
+            "temp_c": current.get("temp_c"),
+            "humidity": current.get("humidity"),
+            "precip_mm": current.get("precip_mm"),
+            "condition": (
+                condition.get("text") if isinstance(condition, dict) else condition
+            ),
+        }
+
+        # Compact JSON context: fewer tokens than Python dict reprs, and
+        # JSON in nudges Gemini toward valid JSON out
+        context = orjson.dumps(
+            {
+                "commodity": commodity.capitalize(),
+                "location": location,
+                "harvest_days": harvest_days,
+                "summary": summary,
+                "forecast": forecast,
+                "weather": weather_brief,
+                "markets": small_market,
+            },
+            default=str,
+        ).decode()
 
-Context:
-- Commodity: {commodity.capitalize()}
-- Location: {location}
-- Harvest readiness: in {harvest_days} days
-- Summary stats: {summary}
-- Price forecast (next days): {forecast}
-- Weather summary: {weather}
-- Sample markets: {small_market}
+        prompt = INSIGHT_PROMPT_HEAD + "\nContext:\n" + context + "\n" + INSIGHT_PROMPT_TASKS
 
-Tasks:
-1️⃣ Recommendation: choose one action from BUY / HOLD / SELL for next 2 weeks. Return confidence (0–100) and reason.
-2️⃣ Yield Outlook: percent change vs last season (approx) and 2–4 influencing factors.
-3️⃣ Price Forecast Comment: 1 sentence on near-term drivers.
-4️⃣ Market Sentiment: overall (positive/neutral/negative) and 2 keywords.
-5️⃣ Optimal Markets: top 5 sell_high (market,state,price) and top 5 buy_low.
-6️⃣ ai_summary (short) and reason (1–3 sentence reasoning).
-
-Return JSON like:
-{{
-  "recommendation": {{"action":"SELL","confidence":81,"reason":"..."}},
-  "yield_outlook": {{"change_percent":"+2.4%","factors":["...","..."]}},
-  "price_forecast_comment":"...",
-  "market_sentiment":{{"overall":"positive","keywords":["export","demand"]}},
-  "optimal_market":{{"sell_high":[{{"market":"X","state":"Y","price":123}}],"buy_low":[...]}},
-  "ai_summary":"short line",
-  "reason":"detailed reasoning (2 sentences)"
-}}
-"""
+        key = hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+        with _gemini_cache_lock:
+            cached = GEMINI_CACHE.get(key)
+        if cached is not None:
+            return cached
 
         ai_resp = client.models.generate_content(
             model="gemini-2.5-flash",
             contents=prompt,
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=InsightResponse,
+            ),
         )
-        text = ai_resp.text.strip()
-
-        # Try parsing Gemini's JSON
-        try:
-            parsed = json.loads(text)
-            if isinstance(parsed, dict) and "recommendation" in parsed:
-                return parsed
-            raise ValueError("Invalid JSON structure from Gemini")
-        except Exception as parse_err:
-            print("⚠️ Gemini parse failed:", parse_err)
-            return fallback_structured_insight(
-                commodity, market_data, summary, forecast, harvest_days, weather
-            )
+        parsed: InsightResponse = ai_resp.parsed
+        if parsed is None:
+            raise ValueError("Gemini returned no parsable structured output")
+        result = parsed.model_dump()
+        with _gemini_cache_lock:
+            GEMINI_CACHE[key] = result
+        return result
 
     except Exception as e:
-        print("⚠️ Gemini call failed:", e)
+        logger.warning("Gemini call failed: %s", e)
         return fallback_structured_insight(
             commodity, market_data, summary, forecast, harvest_days, weather
         )
@@ -311,15 +493,11 @@ Return JSON like:
 def fallback_structured_insight(
     commodity, market_data, summary, forecast, harvest_days, weather
 ):
-    # Compute top sell and buy markets
-    sells = sorted(
-        [m for m in market_data if m.get("modal_price") is not None],
-        key=lambda x: -x["modal_price"],
-    )[:5]
-    buys = sorted(
-        [m for m in market_data if m.get("modal_price") is not None],
-        key=lambda x: x["modal_price"],
-    )[:5]
+    # Compute top sell and buy markets — filter once, then heap-select the
+    # 5 extremes (O(N log 5)) instead of fully sorting the list twice
+    priced = [m for m in market_data if m.get("modal_price") is not None]
+    sells = heapq.nlargest(5, priced, key=lambda x: x["modal_price"])
+    buys = heapq.nsmallest(5, priced, key=lambda x: x["modal_price"])
 
     sell_high = [
         {"market": m["market"], "state": m["state"], "price": m["modal_price"]}
@@ -369,10 +547,27 @@ def fallback_structured_insight(
 # ============================================================
 
 
+@lru_cache(maxsize=1)
 def load_international_prices():
+    """
+    The international CSV is static, so parse it once per process instead of
+    on every request, with lowercased lookup columns precomputed. The raw
+    headers (commodity/port/price_inr_per_tonne) are mapped to the names the
+    trade simulator queries.
+    """
     if not DATA_PATH.exists():
         raise FileNotFoundError("International dataset missing.")
-    return pd.read_csv(DATA_PATH)
+    df = pd.read_csv(DATA_PATH)
+    df = df.rename(
+        columns={
+            "commodity": "Commodity",
+            "port": "Region",
+            "price_inr_per_tonne": "Price_INR_per_Tonne",
+        }
+    )
+    df["_commodity_lc"] = df["Commodity"].str.lower()
+    df["_region_lc"] = df["Region"].str.lower()
+    return df
 
 
 def get_distance_km(source, destination):
@@ -381,8 +576,8 @@ def get_distance_km(source, destination):
             f"https://api.distancematrix.ai/maps/api/distancematrix/json?"
             f"origins={source}&destinations={destination}&key={DISTANCEMATRIX_API_KEY}"
         )
-        res = requests.get(url, timeout=12)
-        element = res.json()["rows"][0]["elements"][0]
+        res = SESSION.get(url, timeout=12)
+        element = orjson.loads(res.content)["rows"][0]["elements"][0]
         if element.get("status") != "OK":
             return estimate_distance_fallback(source, destination)
         dist = element["distance"]["text"]
@@ -391,26 +586,38 @@ def get_distance_km(source, destination):
         return estimate_distance_fallback(source, destination)
 
 
+# Known fallback routes, built once at import time
+FALLBACK_ROUTES = {
+    ("mumbai", "novorossiysk"): 4800,
+    ("mumbai", "dubai"): 1900,
+    ("mumbai", "singapore"): 3900,
+    ("kolkata", "dhaka"): 250,
+    ("chennai", "jakarta"): 3600,
+    ("mumbai", "new york"): 12500,
+    ("mumbai", "rotterdam"): 7100,
+    ("pune", "delhi"): 1450,
+    ("indore", "mumbai"): 585,
+    ("nagpur", "kolkata"): 970,
+}
+
+
 def estimate_distance_fallback(source, destination):
     src, dst = source.lower(), destination.lower()
-    routes = {
-        ("mumbai", "novorossiysk"): 4800,
-        ("mumbai", "dubai"): 1900,
-        ("mumbai", "singapore"): 3900,
-        ("kolkata", "dhaka"): 250,
-        ("chennai", "jakarta"): 3600,
-        ("mumbai", "new york"): 12500,
-        ("mumbai", "rotterdam"): 7100,
-        ("pune", "delhi"): 1450,
-        ("indore", "mumbai"): 585,
-        ("nagpur", "kolkata"): 970,
-    }
-    for (a, b), d in routes.items():
+    # Exact match is an O(1) dict probe; only fall back to the substring
+    # scan for inputs like "Mumbai Port"
+    exact = FALLBACK_ROUTES.get((src, dst))
+    if exact is not None:
+        return exact
+    for (a, b), d in FALLBACK_ROUTES.items():
         if a in src and b in dst:
             return d
     return 5000
 
 
+# Mandi prices arrive as Rs/Quintal; the trade math works in Rs/Tonne
+QUINTAL_TO_TONNE = 10.0
+
+
 def compute_trade_profit(buy_price, sell_price, distance_km, qty_tonnes, domestic=True):
     rate = random.randint(50, 100) if domestic else random.randint(120, 200)
     logistics_cost = rate * distance_km
@@ -420,8 +627,31 @@ def compute_trade_profit(buy_price, sell_price, distance_km, qty_tonnes, domesti
     return logistics_cost, net_profit, roi
 
 
+def compute_trade_profit_batch(buy, sell, dist, qty, rate):
+    """
+    Vectorized variant for scoring many candidate routes at once. Takes arrays
+    of buy/sell prices (INR/tonne), distances (km), quantities (tonnes) and
+    per-km logistics rates; returns arrays of logistics cost, net profit and
+    ROI %. NumPy keeps the arithmetic in C without pulling in a JIT compiler
+    for what is a handful of FLOPs per route.
+    """
+    buy = np.asarray(buy, dtype=float)
+    sell = np.asarray(sell, dtype=float)
+    qty = np.asarray(qty, dtype=float)
+    logistics_cost = np.asarray(rate, dtype=float) * np.asarray(dist, dtype=float)
+    net_profit = (sell - buy) * qty - logistics_cost
+    invested = buy * qty
+    roi = np.divide(
+        net_profit * 100.0,
+        invested,
+        out=np.zeros_like(net_profit),
+        where=invested > 0,
+    )
+    return logistics_cost, net_profit, roi
+
+
 @router.get("/simulate-trade")
-def simulate_trade(
+async def simulate_trade(
     commodity: str = Query(...),
     source: str = Query(...),
     destination: str = Query(...),
@@ -429,42 +659,79 @@ def simulate_trade(
     domestic: bool = Query(False),
 ):
     try:
-        if domestic:
-            # Domestic using Mandi API
-            df = pd.DataFrame(
-                normalize_mandi_records(fetch_mandi_records(commodity), commodity)
-            )
-            src = df[df["market"].str.contains(source, case=False, na=False)]
-            dst = df[df["market"].str.contains(destination, case=False, na=False)]
-            if src.empty or dst.empty:
-                raise HTTPException(
-                    status_code=404, detail="Source/destination not found in mandi data"
+        # Distance lookup is independent of the price lookups — start it now
+        # on a worker thread (requests-based) and overlap it with them
+        distance_task = asyncio.create_task(
+            asyncio.to_thread(get_distance_km, source, destination)
+        )
+
+        try:
+            if domestic:
+                # Domestic using Mandi API — two first-match scans over the
+                # normalized records; no DataFrame needed for a pair of lookups
+                market_data = normalize_mandi_records(
+                    await fetch_mandi_records(commodity), commodity
                 )
-            buy_price = float(src.iloc[0]["modal_price"]) * 10
-            sell_price = float(dst.iloc[0]["modal_price"]) * 10
-        else:
-            # International using CSV
-            df = load_international_prices()
-            df_commodity = df[df["Commodity"].str.lower() == commodity.lower()]
-            src = df_commodity[
-                df_commodity["Region"].str.contains(source, case=False, na=False)
-            ]
-            dst = df_commodity[
-                df_commodity["Region"].str.contains(destination, case=False, na=False)
-            ]
-            if src.empty or dst.empty:
-                raise HTTPException(
-                    status_code=404, detail="Source/destination not found in dataset"
+                src_lc, dst_lc = source.lower(), destination.lower()
+                src_price = next(
+                    (
+                        m["modal_price"]
+                        for m in market_data
+                        if src_lc in (m["market"] or "").lower()
+                    ),
+                    None,
                 )
-            buy_price = float(src.iloc[0]["Price_INR_per_Tonne"])
-            sell_price = float(dst.iloc[0]["Price_INR_per_Tonne"])
+                dst_price = next(
+                    (
+                        m["modal_price"]
+                        for m in market_data
+                        if dst_lc in (m["market"] or "").lower()
+                    ),
+                    None,
+                )
+                if src_price is None or dst_price is None:
+                    raise HTTPException(
+                        status_code=404, detail="Source/destination not found in mandi data"
+                    )
+                # modal_price is already a float from the normalizer
+                buy_price = src_price * QUINTAL_TO_TONNE
+                sell_price = dst_price * QUINTAL_TO_TONNE
+            else:
+                # International using CSV
+                df = load_international_prices()
+                df_commodity = df[df["_commodity_lc"] == commodity.lower()]
+                # regex=False: C-level substring match on the precomputed lowercase
+                # column — no per-request regex compiled from user input
+                src = df_commodity[
+                    df_commodity["_region_lc"].str.contains(
+                        source.lower(), regex=False, na=False
+                    )
+                ]
+                dst = df_commodity[
+                    df_commodity["_region_lc"].str.contains(
+                        destination.lower(), regex=False, na=False
+                    )
+                ]
+                if src.empty or dst.empty:
+                    raise HTTPException(
+                        status_code=404, detail="Source/destination not found in dataset"
+                    )
+                buy_price = float(src.iloc[0]["Price_INR_per_Tonne"])
+                sell_price = float(dst.iloc[0]["Price_INR_per_Tonne"])
+
+        except Exception:
+            # Reap the background distance lookup so a failed price lookup
+            # doesn't leave an orphaned task with a never-retrieved exception
+            distance_task.cancel()
+            await asyncio.gather(distance_task, return_exceptions=True)
+            raise
 
-        distance_km = get_distance_km(source, destination)
+        distance_km = await distance_task
         logistics_cost, net_profit, roi = compute_trade_profit(
             buy_price, sell_price, distance_km, qty_tonnes, domestic
         )
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "mode": "Domestic" if domestic else "International",
                 "domestic": domestic,
@@ -483,20 +750,27 @@ def simulate_trade(
         )
 
     except Exception as e:
-        print("❌ Trade simulation error:", e)
+        logger.error("Trade simulation error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=1)
+def international_options():
+    """Unique commodity/port lists — scanned and sorted once per process."""
+    df = load_international_prices()
+    return {
+        "commodities": sorted(df["Commodity"].unique().tolist()),
+        "ports": sorted(df["Region"].unique().tolist()),
+    }
+
+
 @router.get("/international-options")
 def get_international_options():
     """
     Returns a list of available commodities and ports from the international CSV dataset.
     """
     try:
-        df = load_international_prices()
-        commodities = sorted(df["Commodity"].unique().tolist())
-        ports = sorted(df["Region"].unique().tolist())
-        return JSONResponse(content={"commodities": commodities, "ports": ports})
+        return ORJSONResponse(content=international_options())
     except Exception as e:
-        print("⚠️ Failed to load options:", e)
+        logger.warning("Failed to load options: %s", e)
         raise HTTPException(status_code=500, detail=str(e))